@@ -0,0 +1,108 @@
+"""
+LLM 翻译结果持久缓存 - 以请求内容哈希为键的 sqlite 缓存
+
+用户微调主题提示后重新翻译同一字幕时，未变化的块直接命中缓存，
+省去整块的 LLM 延迟与 token 开销
+
+主要接口:
+    - make_key(): 对请求参数字典做 sha256 取键
+    - get_or_compute(): 命中返回缓存值，否则计算并写入
+    - cache_stats(): 返回本进程的命中/未命中计数
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+
+CACHE_DB_PATH = 'output/.llm_cache/translations.db'
+CACHE_TTL_SECONDS = 30 * 24 * 3600  # 超过 30 天的条目在下次打开时清理
+
+# 键的版本前缀: 提示词大改导致旧译文不可复用时递增，旧条目自然失效
+KEY_VERSION = 'v1'
+
+_LOCK = Lock()
+_stats = {"hits": 0, "misses": 0}
+
+# 进程内复用的长连接: 每块查询都 connect/建表/清理一遍，
+# 开销随库体积线性增长，缓存反而比它省下的东西还慢
+_conn = None
+_conn_pid = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    """返回本进程复用的 sqlite 连接，首次打开时建表并清理一次过期条目
+
+    所有访问都在 _LOCK 下串行，单连接够用；
+    fork 出的子进程不能沿用父进程的连接，按 pid 判断重开
+    """
+    global _conn, _conn_pid
+    if _conn is None or _conn_pid != os.getpid():
+        os.makedirs(os.path.dirname(CACHE_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+        # WAL 模式下读写不互斥，批量模式多进程并发查缓存不会彼此阻塞
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, ts INTEGER)"
+        )
+        # ts 上建索引，TTL 清理不做全表扫描
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_ts ON llm_cache (ts)")
+        conn.execute(
+            "DELETE FROM llm_cache WHERE ts < ?", (int(time.time()) - CACHE_TTL_SECONDS,)
+        )
+        conn.commit()
+        _conn = conn
+        _conn_pid = os.getpid()
+    return _conn
+
+
+def make_key(payload: dict) -> str:
+    """对请求参数字典做稳定序列化后取 sha256，带版本前缀作为缓存键"""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return f"{KEY_VERSION}:{hashlib.sha256(data.encode('utf-8')).hexdigest()}"
+
+
+def get_cached(key: str):
+    """查询缓存，未命中返回 None"""
+    with _LOCK:
+        row = _get_conn().execute(
+            "SELECT value FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def put_cached(key: str, value: str) -> None:
+    """写入缓存条目"""
+    with _LOCK:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, ts) VALUES (?, ?, ?)",
+            (key, value, int(time.time()))
+        )
+        conn.commit()
+
+
+def get_or_compute(key: str, compute):
+    """命中缓存直接返回，否则调用 compute() 并回填"""
+    cached = get_cached(key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached
+
+    _stats["misses"] += 1
+    value = compute()
+    put_cached(key, value)
+    return value
+
+
+def cache_stats() -> dict:
+    """返回本进程累计的命中/未命中计数"""
+    return dict(_stats)
+
+
+if __name__ == '__main__':
+    key = make_key({"lines": "hello", "target": "zh"})
+    print(get_or_compute(key, lambda: "你好"))
+    print(cache_stats())
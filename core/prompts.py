@@ -1,4 +1,5 @@
 import json
+from functools import lru_cache
 from core.utils import *
 
 ## ================================================================
@@ -126,20 +127,75 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
 ## ================================================================
 # @ step5_translate.py & translate_lines.py
 def generate_shared_prompt(previous_content_prompt, after_content_prompt, summary_prompt, things_to_note_prompt):
-    return f'''### Context Information
+    # 稳定内容（摘要、注意事项）在前、逐块变化的上下文在后，
+    # 让供应商的自动前缀缓存跨块命中更长的公共前缀
+    return f'''### Content Summary
+{summary_prompt}
+
+### Points to Note
+{things_to_note_prompt}
+
+### Context Information
 <previous_content>
 {previous_content_prompt}
 </previous_content>
 
 <subsequent_content>
 {after_content_prompt}
-</subsequent_content>
+</subsequent_content>'''
 
-### Content Summary
-{summary_prompt}
 
-### Points to Note
-{things_to_note_prompt}'''
+@lru_cache(maxsize=32)
+def _faithfulness_header(src_language, target_language):
+    """按 (源语言, 目标语言) 缓存的不变前缀，跨块字节级一致"""
+    return f'''## Role
+You are a professional Netflix subtitle translator, fluent in both {src_language} and {target_language}, as well as their respective cultures. 
+Your expertise lies in accurately understanding the semantics and structure of the original {src_language} text and faithfully translating it into {target_language} while preserving the original meaning.
+
+## Task
+We have a segment of original {src_language} subtitles that need to be directly translated into {target_language}. These subtitles come from a specific context and may contain specific themes and terminology.
+
+1. Translate the original {src_language} subtitles into {target_language} line by line
+2. Ensure the translation is faithful to the original, accurately conveying the original meaning
+3. Consider the context and professional terminology
+
+<translation_principles>
+1. Faithful to the original: Accurately convey the content and meaning of the original text, without arbitrarily changing, adding, or omitting content.
+2. Accurate terminology: Use professional terms correctly and maintain consistency in terminology.
+3. Understand the context: Fully comprehend and reflect the background and contextual relationships of the text.
+</translation_principles>'''
+
+
+@lru_cache(maxsize=32)
+def _expressiveness_header(src_language, target_language):
+    """按 (源语言, 目标语言) 缓存的不变前缀，跨块字节级一致"""
+    return f'''## Role
+You are a professional Netflix subtitle translator and language consultant.
+Your expertise lies not only in accurately understanding the original {src_language} but also in optimizing the {target_language} translation to better suit the target language's expression habits and cultural background.
+
+## Task
+We already have a direct translation version of the original {src_language} subtitles.
+Your task is to reflect on and improve these direct translations to create more natural and fluent {target_language} subtitles.
+
+1. Analyze the direct translation results line by line, pointing out existing issues
+2. Provide detailed modification suggestions
+3. Perform free translation based on your analysis
+4. Do not add comments or explanations in the translation, as the subtitles are for the audience to read
+5. Do not leave empty lines in the free translation, as the subtitles are for the audience to read
+
+<Translation Analysis Steps>
+Please use a two-step thinking process to handle the text line by line:
+
+1. Direct Translation Reflection:
+   - Evaluate language fluency
+   - Check if the language style is consistent with the original text
+   - Check the conciseness of the subtitles, point out where the translation is too wordy
+
+2. {target_language} Free Translation:
+   - Aim for contextual smoothness and naturalness, conforming to {target_language} expression habits
+   - Ensure it's easy for {target_language} audience to understand and accept
+   - Adapt the language style to match the theme (e.g., use casual language for tutorials, professional terminology for technical content, formal language for documentaries)
+</Translation Analysis Steps>'''
 
 def get_prompt_faithfulness(lines, shared_prompt):
     TARGET_LANGUAGE = load_key("target_language")
@@ -152,26 +208,12 @@ def get_prompt_faithfulness(lines, shared_prompt):
     json_format = json.dumps(json_dict, indent=2, ensure_ascii=False)
 
     src_language = load_key("whisper.detected_language")
+    # 不变前缀在最前、可变内容（上下文、原文）靠后，最大化前缀缓存命中段
     prompt_faithfulness = f'''
-## Role
-You are a professional Netflix subtitle translator, fluent in both {src_language} and {TARGET_LANGUAGE}, as well as their respective cultures. 
-Your expertise lies in accurately understanding the semantics and structure of the original {src_language} text and faithfully translating it into {TARGET_LANGUAGE} while preserving the original meaning.
-
-## Task
-We have a segment of original {src_language} subtitles that need to be directly translated into {TARGET_LANGUAGE}. These subtitles come from a specific context and may contain specific themes and terminology.
-
-1. Translate the original {src_language} subtitles into {TARGET_LANGUAGE} line by line
-2. Ensure the translation is faithful to the original, accurately conveying the original meaning
-3. Consider the context and professional terminology
+{_faithfulness_header(src_language, TARGET_LANGUAGE)}
 
 {shared_prompt}
 
-<translation_principles>
-1. Faithful to the original: Accurately convey the content and meaning of the original text, without arbitrarily changing, adding, or omitting content.
-2. Accurate terminology: Use professional terms correctly and maintain consistency in terminology.
-3. Understand the context: Fully comprehend and reflect the background and contextual relationships of the text.
-</translation_principles>
-
 ## INPUT
 <subtitles>
 {lines}
@@ -201,37 +243,12 @@ def get_prompt_expressiveness(faithfulness_result, lines, shared_prompt):
     json_format = json.dumps(json_format, indent=2, ensure_ascii=False)
 
     src_language = load_key("whisper.detected_language")
+    # 不变前缀在最前、可变内容（上下文、译稿）靠后，最大化前缀缓存命中段
     prompt_expressiveness = f'''
-## Role
-You are a professional Netflix subtitle translator and language consultant.
-Your expertise lies not only in accurately understanding the original {src_language} but also in optimizing the {TARGET_LANGUAGE} translation to better suit the target language's expression habits and cultural background.
-
-## Task
-We already have a direct translation version of the original {src_language} subtitles.
-Your task is to reflect on and improve these direct translations to create more natural and fluent {TARGET_LANGUAGE} subtitles.
-
-1. Analyze the direct translation results line by line, pointing out existing issues
-2. Provide detailed modification suggestions
-3. Perform free translation based on your analysis
-4. Do not add comments or explanations in the translation, as the subtitles are for the audience to read
-5. Do not leave empty lines in the free translation, as the subtitles are for the audience to read
+{_expressiveness_header(src_language, TARGET_LANGUAGE)}
 
 {shared_prompt}
 
-<Translation Analysis Steps>
-Please use a two-step thinking process to handle the text line by line:
-
-1. Direct Translation Reflection:
-   - Evaluate language fluency
-   - Check if the language style is consistent with the original text
-   - Check the conciseness of the subtitles, point out where the translation is too wordy
-
-2. {TARGET_LANGUAGE} Free Translation:
-   - Aim for contextual smoothness and naturalness, conforming to {TARGET_LANGUAGE} expression habits
-   - Ensure it's easy for {TARGET_LANGUAGE} audience to understand and accept
-   - Adapt the language style to match the theme (e.g., use casual language for tutorials, professional terminology for technical content, formal language for documentaries)
-</Translation Analysis Steps>
-   
 ## INPUT
 <subtitles>
 {lines}
@@ -4,6 +4,7 @@ Streamlit 字幕翻译界面组件
 
 import streamlit as st
 import os
+import shutil
 from translations.translations import translate as t
 from core.utils import load_key
 
@@ -30,6 +31,42 @@ LANGUAGES = {
     "🇸🇦 العربية": "ar",
 }
 
+# 输出目录在模块导入时创建一次，免去每次点击翻译的重复 syscall
+_OUTPUT_DIR = "output"
+os.makedirs(_OUTPUT_DIR, exist_ok=True)
+
+# 语言名列表与反查表在模块导入时生成一次，每次 rerun 直接复用
+_LANGUAGE_NAMES = list(LANGUAGES.keys())
+_CODE_TO_INDEX = {code: i for i, code in enumerate(LANGUAGES.values())}
+_NAME_TO_INDEX = {name: i for i, name in enumerate(_LANGUAGE_NAMES)}
+
+
+@st.cache_data
+def _read_output_file(file_path: str, mtime: float) -> bytes:
+    """读取输出文件字节串，以 (路径, mtime) 为缓存键
+
+    每次 rerun 只读一次盘；文件重新生成（mtime 变化）时自动失效
+    """
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+@st.cache_data
+def _default_target_index(default_target: str) -> int:
+    """解析目标语言对应的默认下标，按 default_target 缓存避免每次 rerun 重算"""
+    # 语言代码 / 完整语言名直接查表
+    i = _CODE_TO_INDEX.get(default_target)
+    if i is None:
+        i = _NAME_TO_INDEX.get(default_target)
+    if i is not None:
+        return i
+
+    # 配置里存自然语言描述（如 "简体中文"）时才回退到子串匹配
+    for i, (name, code) in enumerate(LANGUAGES.items()):
+        if code in default_target or default_target in name:
+            return i
+    return 1  # 默认简体中文
+
 
 def subtitle_translation_section():
     """字幕翻译界面 section"""
@@ -42,10 +79,11 @@ def subtitle_translation_section():
         </p>
         """, unsafe_allow_html=True)
         
-        # 文件上传
-        uploaded_file = st.file_uploader(
+        # 文件上传（支持多选，多文件并行翻译）
+        uploaded_files = st.file_uploader(
             t("Upload Subtitle File"),
             type=['srt', 'ass', 'ssa', 'vtt'],
+            accept_multiple_files=True,
             help=t("Supported formats: SRT, ASS, SSA, VTT")
         )
         
@@ -55,26 +93,19 @@ def subtitle_translation_section():
         with col1:
             source_lang = st.selectbox(
                 t("Source Language"),
-                options=list(LANGUAGES.keys()),
+                options=_LANGUAGE_NAMES,
                 index=0,
                 help=t("Select the language of the original subtitle")
             )
-        
+
         with col2:
             # 默认选择配置中的目标语言
             default_target = load_key("target_language") or "简体中文"
-            target_options = list(LANGUAGES.keys())
-            
-            # 尝试找到匹配的默认值
-            default_index = 1  # 默认简体中文
-            for i, (name, code) in enumerate(LANGUAGES.items()):
-                if code in default_target or default_target in name:
-                    default_index = i
-                    break
-            
+            default_index = _default_target_index(default_target)
+
             target_lang = st.selectbox(
                 t("Target Language"),
-                options=target_options,
+                options=_LANGUAGE_NAMES,
                 index=default_index,
                 help=t("Select the language to translate to")
             )
@@ -96,10 +127,10 @@ def subtitle_translation_section():
             )
         
         # 翻译按钮
-        if uploaded_file is not None:
+        if uploaded_files:
             if st.button(t("🚀 Start Translating"), key="translate_subtitle_button"):
                 translate_uploaded_subtitle(
-                    uploaded_file,
+                    uploaded_files,
                     LANGUAGES[source_lang],
                     LANGUAGES[target_lang],
                     chunk_size,
@@ -107,72 +138,86 @@ def subtitle_translation_section():
                 )
 
 
-def translate_uploaded_subtitle(uploaded_file, source_lang: str, target_lang: str,
+def translate_uploaded_subtitle(uploaded_files, source_lang: str, target_lang: str,
                                  chunk_size: int, theme_prompt: str = None):
-    """翻译上传的字幕文件"""
+    """翻译上传的字幕文件，多文件时在线程池中并行处理"""
+    import concurrent.futures
     from core.translate_subtitle import translate_subtitle_file
-    
-    # 确保 output 目录存在
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # 获取文件名和扩展名
-    original_name = uploaded_file.name
-    base_name, suffix = os.path.splitext(original_name)
-    
-    # 保存上传的文件到 output 目录
-    input_path = os.path.join(output_dir, original_name)
-    with open(input_path, 'wb') as f:
-        f.write(uploaded_file.getvalue())
-    
-    # 输出文件路径
-    output_filename = f"{base_name}_translated{suffix}"
-    output_path = os.path.join(output_dir, output_filename)
-    
+
+    output_dir = _OUTPUT_DIR
+
+    # 先把所有上传文件流式落盘（按 1MiB 块，不整体载入内存）
+    jobs = []
+    for uploaded_file in uploaded_files:
+        original_name = uploaded_file.name
+        base_name, suffix = os.path.splitext(original_name)
+
+        input_path = os.path.join(output_dir, original_name)
+        uploaded_file.seek(0)
+        with open(input_path, 'wb') as f:
+            shutil.copyfileobj(uploaded_file, f, length=1 << 20)
+
+        output_path = os.path.join(output_dir, f"{base_name}_translated{suffix}")
+        jobs.append((base_name, suffix, input_path, output_path))
+
+    def _translate_one(job):
+        base_name, suffix, input_path, output_path = job
+        return translate_subtitle_file(
+            input_path=input_path,
+            output_path=output_path,
+            source_language=source_lang,
+            target_language=target_lang,
+            theme_prompt=theme_prompt,
+            chunk_size=chunk_size,
+            output_bilingual=True
+        )
+
+    # 翻译为网络 IO 密集型，多文件时线程池并行；st 渲染仍留在主线程
+    results = []
     try:
         with st.spinner(t("Translating subtitle file...")):
-            output_files = translate_subtitle_file(
-                input_path=input_path,
-                output_path=output_path,
-                source_language=source_lang,
-                target_language=target_lang,
-                theme_prompt=theme_prompt,
-                chunk_size=chunk_size,
-                output_bilingual=True
-            )
-        
-        st.success(t("✅ Translation complete!"))
-        st.info(f"{t('Output saved to')}: `{output_dir}/`")
-        
-        # 显示所有输出文件并提供下载按钮
-        st.subheader(t("📁 Generated Files"))
-        
+            if len(jobs) == 1:
+                results = [_translate_one(jobs[0])]
+            else:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(jobs), 4)) as executor:
+                    results = list(executor.map(_translate_one, jobs))
+    except Exception as e:
+        st.error(f"{t('Translation failed')}: {str(e)}")
+        import traceback
+        st.code(traceback.format_exc())
+        return
+
+    st.success(t("✅ Translation complete!"))
+    st.info(f"{t('Output saved to')}: `{output_dir}/`")
+
+    # 显示所有输出文件并提供下载按钮
+    st.subheader(t("📁 Generated Files"))
+
+    for (base_name, suffix, _, _), output_files in zip(jobs, results):
+        if len(jobs) > 1:
+            st.markdown(f"**{base_name}{suffix}**")
+
         file_labels = {
             'translation': ('📝 ' + t('Translation Only'), f'{base_name}_translated{suffix}'),
             'source': ('📄 ' + t('Source Only'), f'{base_name}_src{suffix}'),
             'bilingual': ('🔤 ' + t('Bilingual (Source on top)'), f'{base_name}_bilingual{suffix}'),
             'bilingual_reverse': ('🔤 ' + t('Bilingual (Translation on top)'), f'{base_name}_bilingual_reverse{suffix}')
         }
-        
+
         cols = st.columns(2)
         for idx, (key, (label, filename)) in enumerate(file_labels.items()):
             if key in output_files:
                 with cols[idx % 2]:
                     file_path = output_files[key]
-                    with open(file_path, 'rb') as f:
-                        content = f.read()
+                    # 字节串走 mtime 缓存: 不在每次 rerun 为每个按钮开新句柄
+                    # （download_button 对 file-like 也会整体读进内存，句柄只会泄漏 fd）
                     st.download_button(
                         label=label,
-                        data=content,
+                        data=_read_output_file(file_path, os.path.getmtime(file_path)),
                         file_name=filename,
                         mime="text/plain",
-                        key=f"download_{key}"
+                        key=f"download_{base_name}_{key}"
                     )
-        
-    except Exception as e:
-        st.error(f"{t('Translation failed')}: {str(e)}")
-        import traceback
-        st.code(traceback.format_exc())
 
 
 if __name__ == '__main__':
@@ -10,11 +10,69 @@ Subtitle Dataclass:
 
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Optional
 from pathlib import Path
 
+import numpy as np
 
-@dataclass
+# 预编译正则，避免在逐行/逐块循环中反复查询 re 内部缓存
+# 时间戳模式全部用 \A/\Z 锚定且结构唯一，畸形行上不会触发回溯重试
+_SRT_TIME_RE = re.compile(r'\A(\d{2}:\d{2}:\d{2},\d{3})[ \t]*-->[ \t]*(\d{2}:\d{2}:\d{2},\d{3})')
+_VTT_TIMESTAMP_RE = re.compile(r'\A(?:\d{1,2}:)?\d{2}:\d{2}\.\d{3}\Z')
+
+# ASS 快路径用: 行锚定、大小写不敏感地定位 [Events] 区头
+_ASS_EVENTS_RE = re.compile(r'^[ \t]*\[events\][ \t]*\r?$', re.IGNORECASE | re.MULTILINE)
+
+
+def _strip_braces(s: str) -> str:
+    """移除 {...} ASS 样式标签
+
+    标签单字符定界且不嵌套，C 层 str.find 扫描比正则 NFA 快得多；
+    未闭合的 '{' 原样保留，与原正则 \{[^}]*\} 行为一致
+    """
+    i = s.find('{')
+    if i < 0:
+        return s
+    parts = []
+    pos = 0
+    while i >= 0:
+        j = s.find('}', i + 1)
+        if j < 0:
+            break
+        parts.append(s[pos:i])
+        pos = j + 1
+        i = s.find('{', pos)
+    parts.append(s[pos:])
+    return ''.join(parts)
+
+
+def _strip_angle(s: str) -> str:
+    """移除 <...> VTT 样式标签 (如 <c>, <b>, <i>)
+
+    与原正则 <[^>]+> 行为一致: 空标签 "<>" 和未闭合的 '<' 原样保留
+    """
+    i = s.find('<')
+    if i < 0:
+        return s
+    parts = []
+    pos = 0
+    while i >= 0:
+        j = s.find('>', i + 1)
+        if j < 0:
+            break
+        if j == i + 1:
+            # "<>" 不构成标签，跳过继续向后扫
+            i = s.find('<', i + 1)
+            continue
+        parts.append(s[pos:i])
+        pos = j + 1
+        i = s.find('<', pos)
+    parts.append(s[pos:])
+    return ''.join(parts)
+
+
+@dataclass(slots=True)
 class Subtitle:
     """字幕数据类"""
     index: int
@@ -30,6 +88,45 @@ class Subtitle:
     effect: str = ""
 
 
+@dataclass
+class SubtitleBatch:
+    """列式 (Struct-of-Arrays) 字幕容器
+
+    解析热路径按列追加字符串，省去逐条构造 10 字段 Subtitle 对象的开销；
+    读取时按需生成 Subtitle 视图，下标/切片/迭代行为与 List[Subtitle] 一致
+    """
+    indexes: List[int] = field(default_factory=list)
+    starts: List[str] = field(default_factory=list)
+    ends: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+
+    def append(self, index: int, start: str, end: str, text: str) -> None:
+        self.indexes.append(index)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.texts.append(text)
+
+    def _view(self, i: int) -> Subtitle:
+        return Subtitle(
+            index=self.indexes[i],
+            start=self.starts[i],
+            end=self.ends[i],
+            text=self.texts[i]
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._view(j) for j in range(*i.indices(len(self.texts)))]
+        return self._view(i)
+
+    def __iter__(self):
+        for i in range(len(self.texts)):
+            yield self._view(i)
+
+
 @dataclass
 class ASSMetadata:
     """ASS 文件元数据"""
@@ -38,55 +135,57 @@ class ASSMetadata:
     events_header: str = ""
 
 
-def parse_srt(file_path: str) -> List[Subtitle]:
+def _iter_blocks(fh):
+    """按空行流式切分字幕块，逐块 yield 行列表
+
+    相比 f.read() + re.split 整文件切分，内存占用为 O(单块) 而非 O(文件)
+    """
+    block = []
+    for line in fh:
+        line = line.rstrip('\n')
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def parse_srt(file_path: str) -> SubtitleBatch:
     """
     解析 SRT 字幕文件
-    
+
     Args:
         file_path: SRT 文件路径
-        
+
     Returns:
-        字幕列表
+        字幕列表 (SubtitleBatch，按列存储)
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 移除 BOM
-    content = content.lstrip('\ufeff')
-    
-    # 按空行分割字幕块
-    blocks = re.split(r'\n\s*\n', content.strip())
-    subtitles = []
-    
-    for block in blocks:
-        lines = block.strip().split('\n')
-        if len(lines) < 3:
-            continue
-            
-        try:
-            index = int(lines[0].strip())
-        except ValueError:
-            continue
-            
-        # 解析时间轴
-        time_match = re.match(
-            r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})',
-            lines[1].strip()
-        )
-        if not time_match:
-            continue
-            
-        start = time_match.group(1)
-        end = time_match.group(2)
-        text = '\n'.join(lines[2:])
-        
-        subtitles.append(Subtitle(
-            index=index,
-            start=start,
-            end=end,
-            text=text
-        ))
-    
+    subtitles = SubtitleBatch()
+
+    # utf-8-sig 自动剥离 BOM; 逐块流式解析，不整文件载入
+    with open(file_path, 'r', encoding='utf-8-sig', buffering=1 << 20) as f:
+        for lines in _iter_blocks(f):
+            if len(lines) < 3:
+                continue
+
+            try:
+                index = int(lines[0].strip())
+            except ValueError:
+                continue
+
+            # 解析时间轴
+            time_match = _SRT_TIME_RE.match(lines[1].strip())
+            if not time_match:
+                continue
+
+            start = time_match.group(1)
+            end = time_match.group(2)
+            text = '\n'.join(lines[2:])
+
+            subtitles.append(index, start, end, text)
+
     return subtitles
 
 
@@ -98,14 +197,17 @@ def write_srt(subtitles: List[Subtitle], output_path: str) -> None:
         subtitles: 字幕列表
         output_path: 输出文件路径
     """
+    # 先拼好整块再一次写出，避免每条字幕 3 次 f.write 的调用/编码开销
+    parts = []
+    append = parts.append
+    for i, sub in enumerate(subtitles, 1):
+        append(f"{i}\n{sub.start} --> {sub.end}\n{sub.text}\n\n")
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        for i, sub in enumerate(subtitles, 1):
-            f.write(f"{i}\n")
-            f.write(f"{sub.start} --> {sub.end}\n")
-            f.write(f"{sub.text}\n\n")
+        f.write(''.join(parts))
 
 
-def parse_vtt(file_path: str) -> List[Subtitle]:
+def parse_vtt(file_path: str) -> SubtitleBatch:
     """
     解析 VTT (WebVTT) 字幕文件
     
@@ -113,73 +215,65 @@ def parse_vtt(file_path: str) -> List[Subtitle]:
         file_path: VTT 文件路径
         
     Returns:
-        字幕列表
+        字幕列表 (SubtitleBatch，按列存储)
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 移除 BOM
-    content = content.lstrip('\ufeff')
-    
-    # 检查 WEBVTT 头
-    if not content.strip().startswith('WEBVTT'):
-        raise ValueError("无效的 VTT 文件: 缺少 WEBVTT 头")
-    
-    # 按空行分割块
-    blocks = re.split(r'\n\s*\n', content.strip())
-    subtitles = []
+    subtitles = SubtitleBatch()
     index = 0
-    
-    for block in blocks[1:]:  # 跳过 WEBVTT 头块
-        lines = block.strip().split('\n')
-        if not lines:
-            continue
-        
-        # 跳过 STYLE, REGION, NOTE 块
-        first_line = lines[0].strip().upper()
-        if first_line.startswith('STYLE') or first_line.startswith('REGION') or first_line.startswith('NOTE'):
-            continue
-        
-        # 查找时间轴行
-        time_line_idx = 0
-        for i, line in enumerate(lines):
-            if '-->' in line:
-                time_line_idx = i
-                break
-        else:
-            continue  # 没有时间轴，跳过此块
+
+    with open(file_path, 'r', encoding='utf-8-sig', buffering=1 << 20) as f:
+        blocks = _iter_blocks(f)
+
+        # 检查 WEBVTT 头（第一个块即头块，跳过）
+        try:
+            header = next(blocks)
+        except StopIteration:
+            raise ValueError("无效的 VTT 文件: 缺少 WEBVTT 头")
+        if not header[0].strip().startswith('WEBVTT'):
+            raise ValueError("无效的 VTT 文件: 缺少 WEBVTT 头")
+
+        for lines in blocks:
+            # 跳过 STYLE, REGION, NOTE 块
+            first_line = lines[0].strip().upper()
+            if first_line.startswith('STYLE') or first_line.startswith('REGION') or first_line.startswith('NOTE'):
+                continue
         
-        # 解析时间轴 (格式: HH:MM:SS.mmm --> HH:MM:SS.mmm 或 MM:SS.mmm --> MM:SS.mmm)
-        time_match = re.match(
-            r'(\d{1,2}:)?\d{2}:\d{2}\.\d{3}\s*-->\s*(\d{1,2}:)?\d{2}:\d{2}\.\d{3}',
-            lines[time_line_idx].strip()
-        )
-        if not time_match:
-            continue
+            # 查找时间轴行
+            time_line_idx = 0
+            for i, line in enumerate(lines):
+                if '-->' in line:
+                    time_line_idx = i
+                    break
+            else:
+                continue  # 没有时间轴，跳过此块
         
-        # 提取开始和结束时间
-        time_parts = lines[time_line_idx].split('-->')
-        start_vtt = time_parts[0].strip().split()[0]  # 移除可能的 cue settings
-        end_vtt = time_parts[1].strip().split()[0]
+            # 解析时间轴 (格式: HH:MM:SS.mmm --> HH:MM:SS.mmm 或 MM:SS.mmm --> MM:SS.mmm)
+            # 先按 --> 切开再分别校验两侧, 避免带可选小时组的大正则在畸形行上回溯
+            time_parts = lines[time_line_idx].split('-->')
+            if len(time_parts) != 2:
+                continue
+
+            start_fields = time_parts[0].split()
+            end_fields = time_parts[1].split()  # 移除可能的 cue settings
+            if not start_fields or not end_fields:
+                continue
+            start_vtt = start_fields[0]
+            end_vtt = end_fields[0]
+            if not _VTT_TIMESTAMP_RE.match(start_vtt) or not _VTT_TIMESTAMP_RE.match(end_vtt):
+                continue
         
-        # 转换为 SRT 格式时间
-        start = _vtt_time_to_srt(start_vtt)
-        end = _vtt_time_to_srt(end_vtt)
+            # 转换为 SRT 格式时间
+            start = _vtt_time_to_srt(start_vtt)
+            end = _vtt_time_to_srt(end_vtt)
         
-        # 提取文本（时间轴之后的所有行）
-        text = '\n'.join(lines[time_line_idx + 1:])
+            # 提取文本（时间轴之后的所有行）
+            text = '\n'.join(lines[time_line_idx + 1:])
         
-        # 移除 VTT 样式标签（如 <c>, <b>, <i> 等）
-        text = re.sub(r'<[^>]+>', '', text)
+            # 移除 VTT 样式标签（如 <c>, <b>, <i> 等）
+            text = _strip_angle(text)
         
-        index += 1
-        subtitles.append(Subtitle(
-            index=index,
-            start=start,
-            end=end,
-            text=text
-        ))
-    
+            index += 1
+            subtitles.append(index, start, end, text)
+
     return subtitles
 
 
@@ -191,19 +285,28 @@ def write_vtt(subtitles: List[Subtitle], output_path: str) -> None:
         subtitles: 字幕列表
         output_path: 输出文件路径
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("WEBVTT\n\n")
-        
+    parts = ["WEBVTT\n\n"]
+    append = parts.append
+
+    if isinstance(subtitles, SubtitleBatch):
+        # 列式输入: 整列批量转换时间，循环内零转换开销
+        starts = _srt_times_to_vtt(subtitles.starts)
+        ends = _srt_times_to_vtt(subtitles.ends)
+        for index, start_vtt, end_vtt, text in zip(subtitles.indexes, starts, ends, subtitles.texts):
+            append(f"{index}\n{start_vtt} --> {end_vtt}\n{text}\n\n")
+    else:
         for sub in subtitles:
             # 转换时间格式
             start_vtt = _srt_time_to_vtt(sub.start)
             end_vtt = _srt_time_to_vtt(sub.end)
-            
-            f.write(f"{sub.index}\n")
-            f.write(f"{start_vtt} --> {end_vtt}\n")
-            f.write(f"{sub.text}\n\n")
 
+            append(f"{sub.index}\n{start_vtt} --> {end_vtt}\n{sub.text}\n\n")
 
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
+
+
+@lru_cache(maxsize=1 << 16)
 def _vtt_time_to_srt(vtt_time: str) -> str:
     """将 VTT 时间格式转换为 SRT 时间格式
     
@@ -226,6 +329,7 @@ def _vtt_time_to_srt(vtt_time: str) -> str:
     return f"{int(h):02d}:{m}:{s_ms}"
 
 
+@lru_cache(maxsize=1 << 16)
 def _srt_time_to_vtt(srt_time: str) -> str:
     """将 SRT 时间格式转换为 VTT 时间格式
     
@@ -235,75 +339,146 @@ def _srt_time_to_vtt(srt_time: str) -> str:
     return srt_time.replace(',', '.')
 
 
-def parse_ass(file_path: str) -> tuple[List[Subtitle], ASSMetadata]:
+def _srt_times_to_vtt(srt_times: List[str]) -> List[str]:
+    """批量 SRT→VTT 时间转换
+
+    时间码中不含换行，拼成单串做一次 C 层 replace 再切回，
+    避免逐条调用 _srt_time_to_vtt 的解释器开销
+    """
+    if not srt_times:
+        return []
+    return '\n'.join(srt_times).replace(',', '.').split('\n')
+
+
+def _srt_times_to_ass(srt_times: List[str]) -> List[str]:
+    """批量 SRT→ASS 时间转换，毫秒→厘秒运算走 NumPy 向量化
+
+    固定宽度时间码 (hh:mm:ss,mmm) 按 UCS4 码点一次性解析成整数列，
+    格式不符时回退到逐条转换
+    """
+    if not srt_times:
+        return []
+    if any(len(t) != 12 for t in srt_times):
+        return [_srt_time_to_ass(t) for t in srt_times]
+
+    codes = np.array(srt_times, dtype='U12').view(np.uint32).reshape(len(srt_times), 12) - ord('0')
+    hours = codes[:, 0] * 10 + codes[:, 1]
+    cs = (codes[:, 9] * 100 + codes[:, 10] * 10 + codes[:, 11]) // 10
+    return [f"{h}:{t[3:5]}:{t[6:8]}.{c:02d}"
+            for h, c, t in zip(hours.tolist(), cs.tolist(), srt_times)]
+
+
+def _parse_ass_events(event_lines, metadata: ASSMetadata,
+                      subtitles: List[Subtitle], stop_at_section: bool = False) -> None:
+    """解析 Events 区的行，把 Dialogue 条目追加到 subtitles
+
+    stop_at_section=True 时遇到下一个 section 头即停（events-only 快路径用）
+    """
+    # Format 行解析出的列下标; Format 对整个文件固定，逐条 Dialogue 直接按下标取列
+    n_cols = 0
+    start_col = end_col = text_col = -1
+    style_col = name_col = effect_col = -1
+    ml_col = mr_col = mv_col = -1
+
+    # 对话计数与 append 提升为局部变量，热循环内省去属性查找与 len() 求值
+    cue_count = len(subtitles)
+    append_subtitle = subtitles.append
+
+    # 紧凑循环: 只区分 Dialogue / Format，其余行直接跳过
+    for raw in event_lines:
+        line = raw.strip()
+        if line.startswith('Dialogue:'):
+            parts = line[9:].split(',', n_cols - 1)
+            if len(parts) >= n_cols:
+                # 转换时间格式
+                start = _ass_time_to_srt(parts[start_col]) if start_col >= 0 else "00:00:00,000"
+                end = _ass_time_to_srt(parts[end_col]) if end_col >= 0 else "00:00:00,000"
+                text = parts[text_col] if text_col >= 0 else ''
+                text = text.replace('\\N', '\n').replace('\\n', '\n')
+
+                # 移除 ASS 样式标签
+                text = _strip_braces(text)
+
+                cue_count += 1
+                append_subtitle(Subtitle(
+                    index=cue_count,
+                    start=start,
+                    end=end,
+                    text=text,
+                    style=parts[style_col] if style_col >= 0 else 'Default',
+                    name=parts[name_col] if name_col >= 0 else '',
+                    margin_l=int(parts[ml_col] or 0) if ml_col >= 0 else 0,
+                    margin_r=int(parts[mr_col] or 0) if mr_col >= 0 else 0,
+                    margin_v=int(parts[mv_col] or 0) if mv_col >= 0 else 0,
+                    effect=parts[effect_col] if effect_col >= 0 else ''
+                ))
+        elif line.startswith('Format:'):
+            metadata.events_header = line
+            format_parts = line[7:].split(',')
+            dialogue_format = [p.strip().lower() for p in format_parts]
+
+            # Format 固定后一次解析列下标，免去每条 Dialogue 的 dict(zip) 与哈希查找
+            col = {f_name: f_i for f_i, f_name in enumerate(dialogue_format)}
+            n_cols = len(dialogue_format)
+            start_col, end_col, text_col = col.get('start', -1), col.get('end', -1), col.get('text', -1)
+            style_col, name_col, effect_col = col.get('style', -1), col.get('name', -1), col.get('effect', -1)
+            ml_col, mr_col, mv_col = col.get('marginl', -1), col.get('marginr', -1), col.get('marginv', -1)
+        elif stop_at_section and line.startswith('[') and line.endswith(']'):
+            break
+
+
+def parse_ass(file_path: str, include_metadata: bool = True) -> tuple[List[Subtitle], ASSMetadata]:
     """
     解析 ASS 字幕文件
-    
+
     Args:
         file_path: ASS 文件路径
-        
+        include_metadata: 是否收集 Script Info / Styles 元数据；
+            只需要往 SRT/VTT 转的调用方可关掉，跳过对非 Events 区的处理
+
     Returns:
         (字幕列表, ASS 元数据)
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 移除 BOM
-    content = content.lstrip('\ufeff')
+    # 二进制整读 + 一次解码: 大文件省去增量解码器开销，utf-8-sig 顺带去 BOM
+    with open(file_path, 'rb', buffering=1 << 20) as f:
+        content = f.read().decode('utf-8-sig')
     
     metadata = ASSMetadata()
     subtitles = []
-    
-    current_section = None
-    dialogue_format = []
-    
-    for line in content.split('\n'):
-        line = line.strip()
-        
-        # 检测 section
+
+    if not include_metadata:
+        # 快路径: 行锚定正则定位 [Events] 区头（与全量解析一样大小写不敏感，
+        # 且不会被 Script Info 文本里出现的 "[Events]" 带偏）；
+        # 定位不到就回退全量解析，而不是静默返回空结果
+        events_match = _ASS_EVENTS_RE.search(content)
+        if events_match is not None:
+            event_lines = content[events_match.end():].split('\n')[1:]
+            _parse_ass_events(event_lines, metadata, subtitles, stop_at_section=True)
+            return subtitles, metadata
+
+    lines = content.split('\n')
+
+    # 单次扫描定位各 section 头，之后按区间切片处理
+    # 避免在 Dialogue 热循环中对每行做 section 分发判断
+    bounds = []
+    for i, raw in enumerate(lines):
+        line = raw.strip()
         if line.startswith('[') and line.endswith(']'):
-            current_section = line[1:-1].lower()
-            if current_section == 'script info':
-                metadata.script_info.append(line)
-            elif current_section in ['v4 styles', 'v4+ styles']:
-                metadata.styles.append(line)
-            continue
-        
-        if current_section == 'script info':
-            metadata.script_info.append(line)
-        elif current_section in ['v4 styles', 'v4+ styles']:
-            metadata.styles.append(line)
-        elif current_section == 'events':
-            if line.startswith('Format:'):
-                metadata.events_header = line
-                format_parts = line[7:].split(',')
-                dialogue_format = [p.strip().lower() for p in format_parts]
-            elif line.startswith('Dialogue:'):
-                parts = line[9:].split(',', len(dialogue_format) - 1)
-                if len(parts) >= len(dialogue_format):
-                    sub_dict = dict(zip(dialogue_format, parts))
-                    
-                    # 转换时间格式
-                    start = _ass_time_to_srt(sub_dict.get('start', '0:00:00.00'))
-                    end = _ass_time_to_srt(sub_dict.get('end', '0:00:00.00'))
-                    text = sub_dict.get('text', '').replace('\\N', '\n').replace('\\n', '\n')
-                    
-                    # 移除 ASS 样式标签
-                    text = re.sub(r'\{[^}]*\}', '', text)
-                    
-                    subtitles.append(Subtitle(
-                        index=len(subtitles) + 1,
-                        start=start,
-                        end=end,
-                        text=text,
-                        style=sub_dict.get('style', 'Default'),
-                        name=sub_dict.get('name', ''),
-                        margin_l=int(sub_dict.get('marginl', 0) or 0),
-                        margin_r=int(sub_dict.get('marginr', 0) or 0),
-                        margin_v=int(sub_dict.get('marginv', 0) or 0),
-                        effect=sub_dict.get('effect', '')
-                    ))
-    
+            bounds.append((line[1:-1].lower(), i))
+    bounds.append(('', len(lines)))
+
+    for (section, start_i), (_, end_i) in zip(bounds, bounds[1:]):
+        header = lines[start_i].strip()
+
+        if section == 'script info':
+            metadata.script_info.append(header)
+            metadata.script_info.extend(l.strip() for l in lines[start_i + 1:end_i])
+        elif section in ('v4 styles', 'v4+ styles'):
+            metadata.styles.append(header)
+            metadata.styles.extend(l.strip() for l in lines[start_i + 1:end_i])
+        elif section == 'events':
+            _parse_ass_events(lines[start_i + 1:end_i], metadata, subtitles)
+
     return subtitles, metadata
 
 
@@ -319,57 +494,137 @@ def write_ass(subtitles: List[Subtitle], output_path: str,
     """
     if metadata is None:
         metadata = _default_ass_metadata()
-    
+
+    # Script Info / Styles / Events 逐段拼接，单次写出
+    parts = []
+    append = parts.append
+    for line in metadata.script_info:
+        append(f"{line}\n")
+    append("\n")
+
+    for line in metadata.styles:
+        append(f"{line}\n")
+    append("\n")
+
+    append("[Events]\n")
+    append(metadata.events_header + "\n")
+
+    subs = subtitles if isinstance(subtitles, list) else list(subtitles)
+    starts = _srt_times_to_ass([sub.start for sub in subs])
+    ends = _srt_times_to_ass([sub.end for sub in subs])
+    for sub, start, end in zip(subs, starts, ends):
+        text = sub.text.replace('\n', '\\N')
+
+        append(f"Dialogue: 0,{start},{end},{sub.style},{sub.name},"
+               f"{sub.margin_l},{sub.margin_r},{sub.margin_v},{sub.effect},{text}\n")
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        # 写入 Script Info
-        for line in metadata.script_info:
-            f.write(f"{line}\n")
-        f.write("\n")
-        
-        # 写入 Styles
-        for line in metadata.styles:
-            f.write(f"{line}\n")
-        f.write("\n")
-        
-        # 写入 Events
-        f.write("[Events]\n")
-        f.write(metadata.events_header + "\n")
-        
-        for sub in subtitles:
-            start = _srt_time_to_ass(sub.start)
-            end = _srt_time_to_ass(sub.end)
-            text = sub.text.replace('\n', '\\N')
-            
-            f.write(f"Dialogue: 0,{start},{end},{sub.style},{sub.name},"
-                   f"{sub.margin_l},{sub.margin_r},{sub.margin_v},{sub.effect},{text}\n")
+        f.write(''.join(parts))
 
 
+@lru_cache(maxsize=1 << 16)
 def _ass_time_to_srt(ass_time: str) -> str:
     """将 ASS 时间格式转换为 SRT 时间格式
-    
-    ASS: h:mm:ss.cc (centiseconds)
+
+    ASS: h:mm:ss.cc (centiseconds, 小时位宽可变)
     SRT: hh:mm:ss,mmm (milliseconds)
+
+    字段定宽，直接按下标切片取整，不走正则引擎
     """
-    match = re.match(r'(\d+):(\d{2}):(\d{2})\.(\d{2})', ass_time)
-    if match:
-        h, m, s, cs = match.groups()
-        ms = int(cs) * 10
-        return f"{int(h):02d}:{m}:{s},{ms:03d}"
-    return "00:00:00,000"
+    colon = ass_time.find(':')
+    if colon <= 0 or len(ass_time) != colon + 9:
+        return "00:00:00,000"
+
+    m = ass_time[colon + 1:colon + 3]
+    s = ass_time[colon + 4:colon + 6]
+    if ass_time[colon + 3] != ':' or ass_time[colon + 6] != '.' or not (m.isdigit() and s.isdigit()):
+        return "00:00:00,000"
+
+    try:
+        h = int(ass_time[:colon])
+        ms = int(ass_time[colon + 7:]) * 10
+    except ValueError:
+        return "00:00:00,000"
+    return f"{h:02d}:{m}:{s},{ms:03d}"
 
 
+@lru_cache(maxsize=1 << 16)
 def _srt_time_to_ass(srt_time: str) -> str:
     """将 SRT 时间格式转换为 ASS 时间格式
-    
-    SRT: hh:mm:ss,mmm (milliseconds)
+
+    SRT: hh:mm:ss,mmm (milliseconds, 定宽 12 字符)
     ASS: h:mm:ss.cc (centiseconds)
+
+    字段定宽，直接按下标切片取整，不走正则引擎
     """
-    match = re.match(r'(\d{2}):(\d{2}):(\d{2}),(\d{3})', srt_time)
-    if match:
-        h, m, s, ms = match.groups()
-        cs = int(ms) // 10
-        return f"{int(h)}:{m}:{s}.{cs:02d}"
-    return "0:00:00.00"
+    if len(srt_time) != 12:
+        return "0:00:00.00"
+    try:
+        h = int(srt_time[0:2])
+        cs = int(srt_time[9:12]) // 10
+    except ValueError:
+        return "0:00:00.00"
+    return f"{h}:{srt_time[3:5]}:{srt_time[6:8]}.{cs:02d}"
+
+
+class SubtitleWriter:
+    """流式字幕写出器: 逐条写 cue，经 1MiB 缓冲增量落盘
+
+    输出与对应的 write_srt/write_vtt/write_ass 逐字节一致；
+    用于把多份输出（原文/双语等）放进同一次遍历写出，
+    也支持边翻译边写——写盘与剩余的 LLM 调用重叠进行
+    """
+
+    def __init__(self, output_path: str, metadata: Optional[ASSMetadata] = None):
+        self.output_path = output_path
+        ext = Path(output_path).suffix.lower()
+        self._fmt = 'ass' if ext in ('.ass', '.ssa') else ('vtt' if ext == '.vtt' else 'srt')
+        self._fh = open(output_path, 'w', encoding='utf-8', buffering=1 << 20)
+        self._count = 0
+
+        write = self._fh.write
+        if self._fmt == 'vtt':
+            write("WEBVTT\n\n")
+        elif self._fmt == 'ass':
+            if metadata is None:
+                metadata = _default_ass_metadata()
+            for line in metadata.script_info:
+                write(f"{line}\n")
+            write("\n")
+            for line in metadata.styles:
+                write(f"{line}\n")
+            write("\n")
+            write("[Events]\n")
+            write(metadata.events_header + "\n")
+
+    def write_cue(self, sub: Subtitle, text: Optional[str] = None) -> None:
+        """写出一条字幕；text 给定时覆盖 sub.text（双语拼接用）"""
+        if text is None:
+            text = sub.text
+        self._count += 1
+        if self._fmt == 'srt':
+            self._fh.write(f"{self._count}\n{sub.start} --> {sub.end}\n{text}\n\n")
+        elif self._fmt == 'vtt':
+            self._fh.write(
+                f"{sub.index}\n{_srt_time_to_vtt(sub.start)} --> {_srt_time_to_vtt(sub.end)}\n{text}\n\n"
+            )
+        else:
+            ass_text = text.replace('\n', '\\N')
+            self._fh.write(
+                f"Dialogue: 0,{_srt_time_to_ass(sub.start)},{_srt_time_to_ass(sub.end)},{sub.style},{sub.name},"
+                f"{sub.margin_l},{sub.margin_r},{sub.margin_v},{sub.effect},{ass_text}\n"
+            )
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
 
 
 def _default_ass_metadata() -> ASSMetadata:
@@ -394,13 +649,32 @@ def _default_ass_metadata() -> ASSMetadata:
 def detect_subtitle_format(file_path: str) -> str:
     """
     检测字幕文件格式
-    
+
+    优先嗅探文件头魔数，防止扩展名与实际内容不符时走错解析器
+    （如改名为 .srt 的 VTT 会被 parse_srt 白白扫一遍）；文件不存在
+    或无法识别时回退到扩展名判断
+
     Args:
         file_path: 文件路径
-        
+
     Returns:
         'srt', 'ass', 'vtt' 或 'unknown'
     """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(64)
+    except OSError:
+        head = b''
+
+    # 移除 BOM
+    if head.startswith(b'\xef\xbb\xbf'):
+        head = head[3:]
+
+    if head.startswith(b'WEBVTT'):
+        return 'vtt'
+    if head.lstrip().startswith(b'[Script Info]'):
+        return 'ass'
+
     ext = Path(file_path).suffix.lower()
     if ext == '.srt':
         return 'srt'
@@ -411,13 +685,14 @@ def detect_subtitle_format(file_path: str) -> str:
     return 'unknown'
 
 
-def parse_subtitle(file_path: str) -> tuple[List[Subtitle], Optional[ASSMetadata]]:
+def parse_subtitle(file_path: str, include_metadata: bool = True) -> tuple[List[Subtitle] | SubtitleBatch, Optional[ASSMetadata]]:
     """
     自动检测格式并解析字幕文件
-    
+
     Args:
         file_path: 字幕文件路径
-        
+        include_metadata: 是否收集 ASS 元数据（输出不是 .ass 时可关掉）
+
     Returns:
         (字幕列表, ASS 元数据或 None)
     """
@@ -426,7 +701,7 @@ def parse_subtitle(file_path: str) -> tuple[List[Subtitle], Optional[ASSMetadata
     if fmt == 'srt':
         return parse_srt(file_path), None
     elif fmt == 'ass':
-        return parse_ass(file_path)
+        return parse_ass(file_path, include_metadata=include_metadata)
     elif fmt == 'vtt':
         return parse_vtt(file_path), None
     else:
@@ -6,17 +6,76 @@
     - translate_subtitle_chunks(): 分块并行翻译
 """
 
+import asyncio
 import concurrent.futures
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
 from typing import List, Optional
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from core.subtitle_parser import Subtitle, parse_subtitle, write_subtitle
+from core import llm_cache, translation_cache
+from core.subtitle_parser import Subtitle, SubtitleWriter, detect_subtitle_format, parse_subtitle
 from core.translate_lines import translate_lines
 from core.utils import load_key, update_key
 
 console = Console()
 
+# 每个 LLM 请求的源文本 token 预算（粗估: 1 token ≈ 4 字符）
+SRC_TOKEN_BUDGET = 1500
+
+# 滑动窗口上下文条数: 小窗口足以保证衔接质量，还省输入 token
+CONTEXT_BEFORE = 3
+CONTEXT_AFTER = 2
+
+# 按块字符量分桶: (字符数上限, 并发系数, 请求超时秒)
+# 短块提示小、响应快，给更高并发和紧超时；长块降并发、放宽超时，
+# 避免一个慢长块把短块全堵在后面
+_CHUNK_BUCKETS = (
+    (1000, 2.0, 120),
+    (4000, 1.0, 300),
+    (float('inf'), 0.5, 600),
+)
+
+
+# 纯非语言内容（♪♪、[Music]、纯数字/时间码、括号音效等）没有翻译工作量，
+# 不进 LLM 请求直接透传；也避免块尾孤立的 "♪" 干扰模型对行号的对齐
+PASSTHROUGH_RE = re.compile(r'\A(?:[\W\d_♪♫\s]*|\[[^\]]*\]|\([^)]*\))\Z')
+
+
+def _bucket_index(char_count: int) -> int:
+    """返回字符量落入的桶下标"""
+    for b, (limit, _, _) in enumerate(_CHUNK_BUCKETS):
+        if char_count < limit:
+            return b
+    return len(_CHUNK_BUCKETS) - 1
+
+
+def _estimate_tokens(text: str) -> int:
+    """廉价的 token 数估算，免去引入 tiktoken 依赖
+
+    ASCII 按 4 字符 1 token；CJK 等非 ASCII 字符接近 1 字符 1 token，
+    按 len//4 一刀切会把中日韩源文本低估约 4 倍
+    """
+    ascii_len = len(text.encode('ascii', 'ignore'))
+    return ascii_len // 4 + (len(text) - ascii_len) + 1
+
+
+def _target_max_tokens(src_tokens: int) -> int:
+    """按源文本长度推算输出 token 上限
+
+    响应不只有译文: faithfulness 回显每行 origin + direct，
+    reflect_translate 开启时 expressiveness 还要带 reflect + free，
+    加上 JSON 键名和缩进，整体约为源文本的 4-6 倍；
+    上限按最坏情况放足，宁可松也不能把 JSON 截断在半截
+    """
+    return max(4096, min(32768, 6 * src_tokens + 1024))
+
 
 def prepare_translation_config(source_language: str, target_language: str) -> None:
     """
@@ -31,69 +90,155 @@ def prepare_translation_config(source_language: str, target_language: str) -> No
     update_key("target_language", target_language)
 
 
+def generate_theme(subtitles: List[Subtitle]) -> str:
+    """
+    用 LLM 自动生成主题摘要，供各块翻译作为上下文
+
+    取前 100 条字幕做输入；生成失败时返回空串，翻译按无主题继续
+
+    Args:
+        subtitles: 字幕列表
+
+    Returns:
+        主题摘要（可能为空串）
+    """
+    from core.prompts import get_summary_prompt
+    from core.utils.ask_gpt import ask_gpt
+
+    source_content = '\n'.join(sub.text for sub in subtitles[:100])
+    try:
+        resp = ask_gpt(get_summary_prompt(source_content), resp_type='json', log_title='subtitle_theme')
+        return resp.get('theme', '') or ''
+    except Exception as e:
+        console.print(f"[yellow]主题摘要生成失败，按无主题继续: {e}[/yellow]")
+        return ''
+
+
 def split_subtitles_into_chunks(subtitles: List[Subtitle], 
                                  chunk_size: int = 10) -> List[List[Subtitle]]:
     """
-    将字幕列表分割成多个块
+    将字幕列表按 token 预算贪心分块
+
+    固定条数分块会把大量短句浪费在小请求上，也可能让长句块超出
+    模型输出上限；这里按估算 token 贪心装包，chunk_size 退化为
+    每块的最大条数上限
     
     Args:
         subtitles: 字幕列表
-        chunk_size: 每块的字幕数量
+        chunk_size: 每块的最大字幕条数
         
     Returns:
         字幕块列表
     """
     chunks = []
-    for i in range(0, len(subtitles), chunk_size):
-        chunks.append(subtitles[i:i + chunk_size])
+    n = len(subtitles)
+    i = 0
+    while i < n:
+        budget = _estimate_tokens(subtitles[i].text)
+        j = i + 1
+        while (j < n and j - i < chunk_size
+               and budget + _estimate_tokens(subtitles[j].text) <= SRC_TOKEN_BUDGET):
+            budget += _estimate_tokens(subtitles[j].text)
+            j += 1
+        chunks.append(subtitles[i:j])
+        i = j
     return chunks
 
 
-def translate_chunk(chunk: List[Subtitle], 
-                    chunks: List[List[Subtitle]], 
+def translate_chunk(texts: List[str],
+                    previous_content: Optional[List[str]],
+                    after_content: Optional[List[str]],
                     chunk_index: int,
                     theme_prompt: Optional[str] = None) -> tuple[int, List[str]]:
     """
     翻译单个字幕块
+
+    文本归一化与上下文窗口均由主线程预先算好传入，
+    worker 内除 LLM 调用外不再做逐条 Python 工作
     
     Args:
-        chunk: 当前字幕块
-        chunks: 所有字幕块
+        texts: 当前块的归一化文本列表（已去嵌入换行）
+        previous_content: 前文上下文（可为 None）
+        after_content: 后文上下文（可为 None）
         chunk_index: 当前块索引
         theme_prompt: 主题提示（可选）
         
     Returns:
-        (块索引, 翻译结果列表)
+        (块索引, 翻译结果列表，缺失位置为 None)
     """
-    # 提取文本
-    lines = '\n'.join([sub.text.replace('\n', ' ') for sub in chunk])
-    
-    # 获取上下文
-    previous_content = None
-    after_content = None
-    
-    if chunk_index > 0:
-        prev_chunk = chunks[chunk_index - 1]
-        previous_content = [sub.text for sub in prev_chunk[-3:]]
-    
-    if chunk_index < len(chunks) - 1:
-        next_chunk = chunks[chunk_index + 1]
-        after_content = [sub.text for sub in next_chunk[:2]]
+    source_lang = load_key("whisper.detected_language")
+    target_lang = load_key("target_language")
+    theme = theme_prompt or ""
+
+    # 逐句查持久缓存: 重复短句（片头曲、致谢等）跨块跨文件直接复用译文
+    merged = [None] * len(texts)
+    keys = [None] * len(texts)
+    for i, t in enumerate(texts):
+        if PASSTHROUGH_RE.match(t):
+            # 非语言内容原样透传，不占请求也不进句子缓存
+            merged[i] = t
+        else:
+            keys[i] = translation_cache.make_key(source_lang, target_lang, theme, t)
+            merged[i] = translation_cache.get_cached(keys[i])
+    uncached = [i for i, v in enumerate(merged) if v is None]
+
+    # 整块句句命中，零 LLM 调用
+    if not uncached:
+        return chunk_index, merged
+
+    # 只把未命中的句子拼进请求
+    lines = '\n'.join(texts[i] for i in uncached)
     
-    # 调用翻译
-    translation, _ = translate_lines(
-        lines, 
-        previous_content, 
-        after_content,
-        things_to_note_prompt=None,
-        summary_prompt=theme_prompt,
-        index=chunk_index
+    # 以 (源语言, 目标语言, 模型, reflect 开关, 主题, 原文) 为键查持久缓存，
+    # 未命中才调用 LLM；reflect 开关不同的译文不能互相冒充
+    cache_key = llm_cache.make_key({
+        "source": source_lang,
+        "target": target_lang,
+        "model": load_key("api.model"),
+        "reflect": bool(load_key("reflect_translate")),
+        "theme": theme,
+        "lines": lines,
+    })
+    translation = llm_cache.get_or_compute(
+        cache_key,
+        lambda: translate_lines(
+            lines,
+            previous_content,
+            after_content,
+            things_to_note_prompt=None,
+            summary_prompt=theme,
+            index=chunk_index,
+            max_tokens=_target_max_tokens(_estimate_tokens(lines)),
+            timeout=_CHUNK_BUCKETS[_bucket_index(len(lines))][2]
+        )[0]
     )
-    
+
     # 分割翻译结果
     translated_lines = translation.split('\n')
-    
-    return chunk_index, translated_lines
+
+    # 按原位置合并回去，新译文一个事务批量回填句子缓存
+    new_pairs = []
+    for pos, i in enumerate(uncached):
+        if pos < len(translated_lines):
+            merged[i] = translated_lines[pos].strip()
+            new_pairs.append((keys[i], merged[i]))
+    translation_cache.put_many(new_pairs)
+
+    return chunk_index, merged
+
+
+def _rebuild_chunk(chunk: List[Subtitle], translated_lines: List[str]) -> List[Subtitle]:
+    """按翻译结果重建一个块的字幕对象，缺失位置回退原文"""
+    rebuilt = []
+    for i, sub in enumerate(chunk):
+        if i < len(translated_lines) and translated_lines[i] is not None:
+            translated_text = translated_lines[i].strip()
+        else:
+            translated_text = sub.text  # 如果没有翻译，保留原文
+            console.print(f"[yellow]警告: 第 {sub.index} 条字幕翻译缺失，保留原文[/yellow]")
+        # 只换文本字段，其余 9 个字段原样拷贝，不再手写 10 参构造
+        rebuilt.append(dataclasses.replace(sub, text=translated_text))
+    return rebuilt
 
 
 def translate_subtitles(subtitles: List[Subtitle],
@@ -101,7 +246,8 @@ def translate_subtitles(subtitles: List[Subtitle],
                         target_language: str,
                         theme_prompt: Optional[str] = None,
                         chunk_size: int = 10,
-                        max_workers: Optional[int] = None) -> List[Subtitle]:
+                        max_workers: Optional[int] = None,
+                        cue_writer: Optional[SubtitleWriter] = None) -> List[Subtitle]:
     """
     翻译字幕列表
     
@@ -112,6 +258,7 @@ def translate_subtitles(subtitles: List[Subtitle],
         theme_prompt: 主题提示（可选）
         chunk_size: 每块字幕数量
         max_workers: 并行工作线程数
+        cue_writer: 可选的增量写出器；给定时已完成的连续前缀块边译边落盘
         
     Returns:
         翻译后的字幕列表
@@ -125,54 +272,112 @@ def translate_subtitles(subtitles: List[Subtitle],
     # 分块
     chunks = split_subtitles_into_chunks(subtitles, chunk_size)
     console.print(f"[cyan]将 {len(subtitles)} 条字幕分成 {len(chunks)} 个块进行翻译...[/cyan]")
+
+    # 未指定主题时后台自动生成摘要: 与前几个块的翻译重叠进行，
+    # 不阻塞首块延迟；摘要就绪前完成的块按空主题翻译。
+    # 块数太少时摘要根本来不及用上，直接跳过这笔额外的 LLM 开销；
+    # 用 daemon 线程而非线程池，进程退出不会被还在重试的摘要调用拖住
+    theme_future = None
+    if theme_prompt is None and len(chunks) >= 4:
+        theme_future = concurrent.futures.Future()
+
+        def _theme_worker():
+            theme_future.set_result(generate_theme(subtitles))
+
+        threading.Thread(target=_theme_worker, name='theme-summary', daemon=True).start()
+
+    # 归一化文本与上下文窗口主线程一次性算好，worker 拿到即用
+    # （无嵌入换行的文本直接复用原字符串，不做整串扫描替换和新串分配）
+    all_texts = [sub.text for sub in subtitles]
+    norm_texts = [t if '\n' not in t else t.replace('\n', ' ') for t in all_texts]
+    chunk_texts = []
+    prev_ctxs = []
+    next_ctxs = []
+    offset = 0
+    for chunk in chunks:
+        end = offset + len(chunk)
+        chunk_texts.append(norm_texts[offset:end])
+        prev_ctxs.append(all_texts[max(0, offset - CONTEXT_BEFORE):offset] or None)
+        next_ctxs.append(all_texts[end:end + CONTEXT_AFTER] or None)
+        offset = end
     
-    # 并行翻译
-    results = []
+    # 并行翻译: asyncio + 有界信号量限流
+    # LLM 客户端仍是同步实现，协程里用 to_thread 包住阻塞调用;
+    # 并发上限只由信号量决定，不再受固定线程池大小约束
+    rebuilt = {}
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
         task = progress.add_task("[cyan]翻译字幕中...", total=len(chunks))
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for i, chunk in enumerate(chunks):
-                future = executor.submit(translate_chunk, chunk, chunks, i, theme_prompt)
-                futures.append(future)
-            
-            for future in concurrent.futures.as_completed(futures):
-                results.append(future.result())
+
+        async def _run_all():
+            # 每个长度桶一把信号量: 短块并发翻倍，长块并发减半
+            sems = [
+                asyncio.Semaphore(max(1, int(max_workers * factor)))
+                for _, factor, _ in _CHUNK_BUCKETS
+            ]
+
+            async def _run_one(i: int):
+                sem = sems[_bucket_index(sum(len(t) for t in chunk_texts[i]))]
+                async with sem:
+                    # 摘要就绪才注入，否则归一化为空串（不等待）
+                    theme = theme_prompt
+                    if theme is None:
+                        theme = theme_future.result() if theme_future is not None and theme_future.done() else ""
+                    return await asyncio.to_thread(
+                        translate_chunk, chunk_texts[i], prev_ctxs[i], next_ctxs[i], i, theme
+                    )
+
+            # 增量落盘游标: 连续前缀块一完成就写出，写盘与剩余 LLM 调用重叠
+            next_to_flush = 0
+
+            for coro in asyncio.as_completed([_run_one(i) for i in range(len(chunks))]):
+                chunk_index, translated_lines = await coro
+                rebuilt[chunk_index] = _rebuild_chunk(chunks[chunk_index], translated_lines)
                 progress.update(task, advance=1)
+
+                if cue_writer is not None:
+                    while next_to_flush in rebuilt:
+                        for cue in rebuilt[next_to_flush]:
+                            cue_writer.write_cue(cue)
+                        next_to_flush += 1
+
+        asyncio.run(_run_all())
     
-    # 按顺序排列结果
-    results.sort(key=lambda x: x[0])
-    
-    # 创建翻译后的字幕列表
+    stats = llm_cache.cache_stats()
+    if stats["hits"]:
+        console.print(f"[cyan]LLM 缓存命中 {stats['hits']} 块 / 未命中 {stats['misses']} 块[/cyan]")
+    sent_stats = translation_cache.cache_stats()
+    if sent_stats["hits"]:
+        console.print(f"[cyan]句子缓存命中 {sent_stats['hits']} 句 / 未命中 {sent_stats['misses']} 句[/cyan]")
+
+    # 各块已在完成时重建，这里按块序拼接
     translated_subtitles = []
-    for chunk_index, translated_lines in results:
-        chunk = chunks[chunk_index]
-        
-        for i, sub in enumerate(chunk):
-            # 处理翻译行数不匹配的情况
-            if i < len(translated_lines):
-                translated_text = translated_lines[i].strip()
-            else:
-                translated_text = sub.text  # 如果没有翻译，保留原文
-                console.print(f"[yellow]警告: 第 {sub.index} 条字幕翻译缺失，保留原文[/yellow]")
-            
-            translated_subtitles.append(Subtitle(
-                index=sub.index,
-                start=sub.start,
-                end=sub.end,
-                text=translated_text,
-                style=sub.style,
-                name=sub.name,
-                margin_l=sub.margin_l,
-                margin_r=sub.margin_r,
-                margin_v=sub.margin_v,
-                effect=sub.effect
-            ))
+    for chunk_index in sorted(rebuilt):
+        translated_subtitles.extend(rebuilt[chunk_index])
     
     return translated_subtitles
 
 
+def _load_manifest(manifest_path: str) -> dict:
+    """读取输出目录下的翻译清单，损坏或缺失时按空清单处理"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest_path: str, manifest: dict) -> None:
+    """原子写清单: 先写临时文件再 os.replace，避免中断留下半个 JSON"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(manifest_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def translate_subtitle_file(input_path: str,
                             output_path: str,
                             source_language: str,
@@ -195,87 +400,97 @@ def translate_subtitle_file(input_path: str,
     Returns:
         包含所有输出文件路径的字典
     """
-    import os
-    
     console.print(f"[bold green]开始翻译字幕文件: {input_path}[/bold green]")
     console.print(f"[cyan]源语言: {source_language} -> 目标语言: {target_language}[/cyan]")
-    
-    # 解析输入文件
-    subtitles, metadata = parse_subtitle(input_path)
+
+    output_dir = os.path.dirname(output_path) or "."
+
+    # 内容哈希短路: 输入字节与全部翻译参数都没变、输出文件也还在时，
+    # 直接复用上次结果，整个流水线一次 LLM 调用都不发
+    # （影响译文的配置项——模型与 reflect 开关——也要进键，换模型必须重翻）
+    with open(input_path, 'rb') as f:
+        input_bytes = f.read()
+    params = (f"|{source_language}|{target_language}|{theme_prompt or ''}|{chunk_size}|{output_bilingual}"
+              f"|{load_key('api.model')}|{load_key('reflect_translate')}")
+    run_key = hashlib.sha256(input_bytes + params.encode('utf-8')).hexdigest()
+    manifest_path = os.path.join(output_dir, '.transvision_cache.json')
+    manifest = _load_manifest(manifest_path)
+    entry = manifest.get(run_key)
+    if entry:
+        files = entry.get('files', {})
+        mtimes = entry.get('mtimes', {})
+        if files and all(
+            os.path.exists(p) and os.path.getmtime(p) == mtimes.get(kind)
+            for kind, p in files.items()
+        ):
+            console.print(f"[green]✅ 输入与参数未变化，复用上次的 {len(files)} 个输出文件[/green]")
+            return dict(files)
+
+    # 解析输入文件; 输出不是 .ass 时元数据用不上，走 events-only 快路径
+    need_metadata = detect_subtitle_format(output_path) == 'ass'
+    subtitles, metadata = parse_subtitle(input_path, include_metadata=need_metadata)
     console.print(f"[cyan]解析了 {len(subtitles)} 条字幕[/cyan]")
     
-    # 翻译
-    translated_subtitles = translate_subtitles(
-        subtitles,
-        source_language,
-        target_language,
-        theme_prompt,
-        chunk_size
-    )
-    
     # 准备输出路径
     base_path, ext = os.path.splitext(output_path)
-    output_dir = os.path.dirname(output_path) or "."
     base_name = os.path.basename(base_path).replace("_translated", "")
     
     output_files = {}
     
-    # 1. 输出译文字幕
-    write_subtitle(translated_subtitles, output_path, metadata)
+    # 1. 译文字幕边翻译边写: 完成的连续前缀块立刻落盘
+    # 先写 .partial 临时文件，全部翻译成功后才原子替换正式路径——
+    # 失败或中断的重跑不会截掉上次的好输出，下游也看不到半截文件
+    # （.partial 插在扩展名前，SubtitleWriter 按后缀识别格式不受影响）
+    partial_path = f"{base_path}.partial{ext}"
+    try:
+        with SubtitleWriter(partial_path, metadata) as translation_writer:
+            translated_subtitles = translate_subtitles(
+                subtitles,
+                source_language,
+                target_language,
+                theme_prompt,
+                chunk_size,
+                cue_writer=translation_writer
+            )
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, output_path)
     output_files['translation'] = output_path
     console.print(f"[green]✅ 译文字幕: {output_path}[/green]")
     
     if output_bilingual:
-        # 2. 输出原文字幕
+        # 2-4. 原文 + 两种双语: 单次遍历同时写三个文件，
+        # 不再为每份输出构造完整的 Subtitle 中间列表
         src_path = os.path.join(output_dir, f"{base_name}_src{ext}")
-        write_subtitle(subtitles, src_path, metadata)
+        bilingual_path = os.path.join(output_dir, f"{base_name}_bilingual{ext}")
+        bilingual_reverse_path = os.path.join(output_dir, f"{base_name}_bilingual_reverse{ext}")
+
+        with SubtitleWriter(src_path, metadata) as w_src, \
+             SubtitleWriter(bilingual_path, metadata) as w_bi, \
+             SubtitleWriter(bilingual_reverse_path, metadata) as w_rev:
+            for orig, trans in zip(subtitles, translated_subtitles):
+                w_src.write_cue(orig)
+                w_bi.write_cue(orig, f"{orig.text}\n{trans.text}")
+                w_rev.write_cue(orig, f"{trans.text}\n{orig.text}")
+
         output_files['source'] = src_path
         console.print(f"[green]✅ 原文字幕: {src_path}[/green]")
-        
-        # 3. 输出双语字幕 (原文在上，译文在下)
-        bilingual_subtitles = []
-        for orig, trans in zip(subtitles, translated_subtitles):
-            bilingual_subtitles.append(Subtitle(
-                index=orig.index,
-                start=orig.start,
-                end=orig.end,
-                text=f"{orig.text}\n{trans.text}",
-                style=orig.style,
-                name=orig.name,
-                margin_l=orig.margin_l,
-                margin_r=orig.margin_r,
-                margin_v=orig.margin_v,
-                effect=orig.effect
-            ))
-        
-        bilingual_path = os.path.join(output_dir, f"{base_name}_bilingual{ext}")
-        write_subtitle(bilingual_subtitles, bilingual_path, metadata)
         output_files['bilingual'] = bilingual_path
         console.print(f"[green]✅ 双语字幕: {bilingual_path}[/green]")
-        
-        # 4. 输出双语字幕 (译文在上，原文在下)
-        bilingual_reverse_subtitles = []
-        for orig, trans in zip(subtitles, translated_subtitles):
-            bilingual_reverse_subtitles.append(Subtitle(
-                index=orig.index,
-                start=orig.start,
-                end=orig.end,
-                text=f"{trans.text}\n{orig.text}",
-                style=orig.style,
-                name=orig.name,
-                margin_l=orig.margin_l,
-                margin_r=orig.margin_r,
-                margin_v=orig.margin_v,
-                effect=orig.effect
-            ))
-        
-        bilingual_reverse_path = os.path.join(output_dir, f"{base_name}_bilingual_reverse{ext}")
-        write_subtitle(bilingual_reverse_subtitles, bilingual_reverse_path, metadata)
         output_files['bilingual_reverse'] = bilingual_reverse_path
         console.print(f"[green]✅ 双语字幕(译文优先): {bilingual_reverse_path}[/green]")
     
     console.print(f"[bold green]✅ 翻译完成! 共生成 {len(output_files)} 个字幕文件[/bold green]")
-    
+
+    # 记录本次运行的输出与 mtime，供下次同参数重跑短路
+    manifest[run_key] = {
+        'files': output_files,
+        'mtimes': {kind: os.path.getmtime(p) for kind, p in output_files.items()},
+    }
+    _save_manifest(manifest_path, manifest)
+
     return output_files
 
 
@@ -0,0 +1,116 @@
+"""
+句子级翻译持久缓存 - 以单句内容哈希为键的 sqlite 缓存
+
+和 llm_cache（整块请求级）互补: 重复出现的短句（"Thank you"、片头曲、
+演职员表等）即使落在不同的块、不同的文件里，也能逐句命中，
+只把真正没见过的句子发给 LLM
+
+主要接口:
+    - make_key(): 对 (源语言, 目标语言, 主题, 原文) 取带版本前缀的 md5 键
+    - get_cached() / put_cached(): 单句查询与写入
+    - cache_stats(): 返回本进程的命中/未命中计数
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Optional
+
+CACHE_DB_PATH = 'output/.llm_cache/sentences.db'
+CACHE_TTL_SECONDS = 30 * 24 * 3600  # 超过 30 天的条目在下次打开时清理
+
+# 键的版本前缀: 提示词大改导致旧译文不可复用时递增，旧条目自然失效
+KEY_VERSION = 'v1'
+
+_LOCK = Lock()
+_stats = {"hits": 0, "misses": 0}
+
+# 进程内复用的长连接: 每句查询都 connect/建表/清理一遍，
+# 开销随库体积线性增长，缓存反而比它省下的东西还慢
+_conn = None
+_conn_pid = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    """返回本进程复用的 sqlite 连接，首次打开时建表并清理一次过期条目
+
+    所有访问都在 _LOCK 下串行，单连接够用；
+    fork 出的子进程不能沿用父进程的连接，按 pid 判断重开
+    """
+    global _conn, _conn_pid
+    if _conn is None or _conn_pid != os.getpid():
+        os.makedirs(os.path.dirname(CACHE_DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+        # WAL 模式下读写不互斥，多线程/多进程并行翻译时查缓存不会彼此阻塞
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentence_cache (hash TEXT PRIMARY KEY, translation TEXT, ts INTEGER)"
+        )
+        # ts 上建索引，TTL 清理不做全表扫描
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sentence_cache_ts ON sentence_cache (ts)")
+        conn.execute(
+            "DELETE FROM sentence_cache WHERE ts < ?", (int(time.time()) - CACHE_TTL_SECONDS,)
+        )
+        conn.commit()
+        _conn = conn
+        _conn_pid = os.getpid()
+    return _conn
+
+
+def make_key(source_lang: str, target_lang: str, theme: str, text: str) -> str:
+    """对 (源语言|目标语言|主题|原文) 取 md5，带版本前缀作为缓存键"""
+    data = f"{source_lang}|{target_lang}|{theme}|{text}"
+    return f"{KEY_VERSION}:{hashlib.md5(data.encode('utf-8')).hexdigest()}"
+
+
+def get_cached(key: str) -> Optional[str]:
+    """查询单句缓存，未命中返回 None"""
+    with _LOCK:
+        row = _get_conn().execute(
+            "SELECT translation FROM sentence_cache WHERE hash = ?", (key,)
+        ).fetchone()
+    if row is not None:
+        _stats["hits"] += 1
+        return row[0]
+    _stats["misses"] += 1
+    return None
+
+
+def put_cached(key: str, translation: str) -> None:
+    """写入单句缓存条目"""
+    with _LOCK:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO sentence_cache (hash, translation, ts) VALUES (?, ?, ?)",
+            (key, translation, int(time.time()))
+        )
+        conn.commit()
+
+
+def put_many(pairs) -> None:
+    """批量写入 (键, 译文)，一个事务落盘，块内逐句写入时用"""
+    pairs = list(pairs)
+    if not pairs:
+        return
+    now = int(time.time())
+    with _LOCK:
+        conn = _get_conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO sentence_cache (hash, translation, ts) VALUES (?, ?, ?)",
+            [(k, v, now) for k, v in pairs]
+        )
+        conn.commit()
+
+
+def cache_stats() -> dict:
+    """返回本进程累计的命中/未命中计数"""
+    return dict(_stats)
+
+
+if __name__ == '__main__':
+    k = make_key('en', 'zh', '', 'Thank you')
+    put_cached(k, '谢谢')
+    print(get_cached(k))
+    print(cache_stats())
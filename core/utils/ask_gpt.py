@@ -41,7 +41,7 @@ def _load_cache(prompt, resp_type, log_title):
 # ------------
 
 @except_handler("GPT request failed", retry=5)
-def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
+def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default", max_tokens=None, timeout=None):
     if not load_key("api.key"):
         raise ValueError("API key is not set")
     # check cache
@@ -65,8 +65,10 @@ def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
         model=model,
         messages=messages,
         response_format=response_format,
-        timeout=300
+        timeout=timeout or 300
     )
+    if max_tokens:
+        params["max_tokens"] = max_tokens
     resp_raw = client.chat.completions.create(**params)
 
     # process and return full result
@@ -1,4 +1,6 @@
 from ruamel.yaml import YAML
+import os
+import tempfile
 import threading
 
 CONFIG_PATH = 'config.yaml'
@@ -7,14 +9,35 @@ lock = threading.Lock()
 yaml = YAML()
 yaml.preserve_quotes = True
 
+# 进程内配置缓存: 以文件 mtime 为失效依据
+# load_key 调用极频繁（每块翻译都要读语言/模型），不该每次都读盘重新解析 YAML
+_cache_data = None
+_cache_mtime = None
+
 # -----------------------
 # load & update config
 # -----------------------
 
+def _load_config():
+    """返回缓存的配置字典，文件被外部改动（mtime 变化）时自动重载"""
+    global _cache_data, _cache_mtime
+    mtime = os.path.getmtime(CONFIG_PATH)
+    if _cache_data is None or mtime != _cache_mtime:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
+            _cache_data = yaml.load(file)
+        _cache_mtime = mtime
+    return _cache_data
+
+def invalidate_config_cache():
+    """强制下次 load_key 重新读盘（测试或外部写入后用）"""
+    global _cache_data, _cache_mtime
+    with lock:
+        _cache_data = None
+        _cache_mtime = None
+
 def load_key(key):
     with lock:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
-            data = yaml.load(file)
+        data = _load_config()
 
     keys = key.split('.')
     value = data
@@ -26,9 +49,9 @@ def load_key(key):
     return value
 
 def update_key(key, new_value):
+    global _cache_mtime
     with lock:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
-            data = yaml.load(file)
+        data = _load_config()
 
         keys = key.split('.')
         current = data
@@ -39,9 +62,24 @@ def update_key(key, new_value):
                 return False
 
         if isinstance(current, dict) and keys[-1] in current:
+            # 值没变就不碰磁盘，省去无谓的重写和 mtime 失效
+            if current[keys[-1]] == new_value:
+                return True
             current[keys[-1]] = new_value
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as file:
-                yaml.dump(data, file)
+            # 仍然写穿到磁盘: 批量模式的子进程靠文件读到最新配置；
+            # 先写临时文件再 os.replace 原子替换，并发读者永远只会
+            # 看到完整的旧文件或完整的新文件，不会读到截断的半个 YAML
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(CONFIG_PATH)), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    yaml.dump(data, file)
+                os.replace(tmp_path, CONFIG_PATH)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            _cache_mtime = os.path.getmtime(CONFIG_PATH)
             return True
         else:
             raise KeyError(f"Key '{keys[-1]}' not found in configuration")
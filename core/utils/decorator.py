@@ -1,4 +1,5 @@
 import functools
+import random
 import time
 import os
 from rich import print as rprint
@@ -22,7 +23,8 @@ def except_handler(error_msg, retry=0, delay=1, default_return=None):
                         if default_return is not None:
                             return default_return
                         raise last_exception
-                    time.sleep(delay * (2**i))
+                    # 指数退避加随机抖动，避免并发 worker 同步重试打爆限流
+                    time.sleep(delay * (2**i) * (0.5 + random.random()))
         return wrapper
     return decorator
 
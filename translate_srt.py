@@ -4,6 +4,7 @@
 
 用法:
     python translate_srt.py input.srt --source en --target 简体中文 [--output output.srt]
+    python translate_srt.py --batch "season1/*.srt" --source en --target 简体中文
     
 示例:
     python translate_srt.py video.srt -s en -t 简体中文
@@ -11,6 +12,8 @@
 """
 
 import argparse
+import concurrent.futures
+import glob
 import os
 import sys
 
@@ -18,7 +21,7 @@ import sys
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from core.translate_subtitle import translate_subtitle_file
+from core.translate_subtitle import prepare_translation_config, translate_subtitle_file
 from core.subtitle_parser import detect_subtitle_format
 from core.utils import load_key
 from rich.console import Console
@@ -32,6 +35,63 @@ def get_default_output_path(input_path: str) -> str:
     return f"{base}_translated{ext}"
 
 
+def translate_one_file(input_path: str, source: str, target: str,
+                       theme: str, chunk_size: int) -> tuple[str, bool, str]:
+    """批量模式的子进程入口: 翻译单个文件，返回 (输入路径, 是否成功, 错误信息)"""
+    try:
+        translate_subtitle_file(
+            input_path=input_path,
+            output_path=get_default_output_path(input_path),
+            source_language=source,
+            target_language=target,
+            theme_prompt=theme,
+            chunk_size=chunk_size
+        )
+        return input_path, True, ''
+    except Exception as e:
+        return input_path, False, str(e)
+
+
+def run_batch(input_glob: str, source: str, target: str,
+              theme: str, chunk_size: int) -> None:
+    """按 glob 匹配多个字幕文件，进程池逐文件并行翻译
+
+    每个文件的工作彼此独立，按 CPU 核数开子进程近线性加速；
+    句子级 sqlite 缓存跨进程共享，剧集间重复台词互相命中
+    """
+    files = sorted(glob.glob(input_glob))
+    files = [f for f in files if detect_subtitle_format(f) != 'unknown']
+    if not files:
+        console.print(f"[red]错误: 没有匹配到字幕文件: {input_glob}[/red]")
+        sys.exit(1)
+
+    console.print(f"[cyan]批量模式: 共 {len(files)} 个文件[/cyan]")
+
+    # 语言配置先在父进程写好，子进程里的 update_key 全部命中"值没变"
+    # 短路，不会出现 N 个 worker 同时重写 config.yaml
+    prepare_translation_config(source, target)
+
+    failed = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(len(files), os.cpu_count() or 1)
+    ) as executor:
+        futures = [
+            executor.submit(translate_one_file, f, source, target, theme, chunk_size)
+            for f in files
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            input_path, ok, err = future.result()
+            if ok:
+                console.print(f"[green]✅ {input_path}[/green]")
+            else:
+                failed.append(input_path)
+                console.print(f"[red]❌ {input_path}: {err}[/red]")
+
+    console.print(f"[bold green]批量翻译完成: 成功 {len(files) - len(failed)} / {len(files)}[/bold green]")
+    if failed:
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='VideoLingo 字幕翻译工具 - 独立翻译字幕文件',
@@ -48,8 +108,16 @@ def main():
     )
     
     parser.add_argument('input', 
+                        nargs='?',
+                        default=None,
                         help='输入字幕文件路径 (支持 .srt, .ass, .ssa)')
     
+    parser.add_argument('--batch',
+                        metavar='INPUT_GLOB',
+                        default=None,
+                        help='批量模式: 按 glob 匹配多个文件并行翻译 (如 "season1/*.srt")，'
+                             '输出路径按 <input>_translated.<ext> 生成')
+    
     parser.add_argument('-s', '--source', 
                         required=True,
                         help='源语言 (如: en, English, 英语)')
@@ -72,8 +140,22 @@ def main():
                         help='视频主题描述（可选，帮助提升翻译质量）')
 
     args = parser.parse_args()
-    
+
+    # 设置目标语言
+    target_language = args.target or load_key("target_language")
+    if not target_language:
+        console.print("[red]错误: 未指定目标语言，请使用 -t 参数或在 config.yaml 中设置 target_language[/red]")
+        sys.exit(1)
+
+    # 批量模式: glob 匹配多文件，进程池并行
+    if args.batch:
+        run_batch(args.batch, args.source, target_language, args.theme, args.chunk_size)
+        return
+
     # 检查输入文件
+    if args.input is None:
+        console.print("[red]错误: 未指定输入文件（或使用 --batch 批量模式）[/red]")
+        sys.exit(1)
     if not os.path.exists(args.input):
         console.print(f"[red]错误: 文件不存在: {args.input}[/red]")
         sys.exit(1)
@@ -87,12 +169,6 @@ def main():
     # 设置输出路径
     output_path = args.output or get_default_output_path(args.input)
     
-    # 设置目标语言
-    target_language = args.target or load_key("target_language")
-    if not target_language:
-        console.print("[red]错误: 未指定目标语言，请使用 -t 参数或在 config.yaml 中设置 target_language[/red]")
-        sys.exit(1)
-    
     # 开始翻译
     try:
         translate_subtitle_file(